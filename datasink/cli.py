@@ -2,12 +2,13 @@
 # The command-line interface for the DataSync tool.
 
 import argparse
-from datasink.core import sync_data
+import functools
+import os
+import sys
 
-def main():
-    """
-    Parses command-line arguments and calls the datasink.core data sync logic.
-    """
+@functools.lru_cache(maxsize=1)
+def _build_parser():
+    """Builds the argument parser on first use; later calls reuse the same one."""
     parser = argparse.ArgumentParser(
         description="A simple command-line tool to back up or transfer data.",
         formatter_class=argparse.RawTextHelpFormatter
@@ -19,6 +20,31 @@ def main():
         action="store_true", 
         help="Move the source instead of copying (the default action)."
     )
+    return parser
+
+def __getattr__(name):
+    """
+    Imports datasink.core's sync_data the first time it's needed.
+    --help and argument errors exit before then, so they never load core.
+    """
+    if name == "sync_data":
+        from datasink.core import sync_data
+        globals()["sync_data"] = sync_data
+        return sync_data
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def get_parser():
+    """Returns the CLI's argument parser (shared between calls to main())."""
+    return _build_parser()
+
+def main():
+    """
+    Parses command-line arguments and calls the datasink.core data sync logic.
+    """
+    # argparse normally takes the program name from sys.argv[0] when the parser
+    # is created; refresh it here since the parser outlives a single invocation.
+    parser = _build_parser()
+    parser.prog = os.path.basename(sys.argv[0])
     args = parser.parse_args()
 
     # Determine the operation based on the '--move' flag
@@ -28,6 +54,10 @@ def main():
     print(f"Source: {args.source}")
     print(f"Destination: {args.destination}")
     
+    # Look sync_data up through the module so the lazy import (or a test's
+    # patch of datasink.cli.sync_data) is honoured.
+    sync_data = getattr(sys.modules[__name__], "sync_data")
+
     # Call the datasink.core logic function with the parsed arguments
     success, message = sync_data(args.source, args.destination, operation)
     
@@ -2,57 +2,524 @@
 # Contains the main logic for copying and moving files and directories.
 
 import os
+import errno
+import functools
 import shutil
+import stat
+import sys
 import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
+from typing import Callable, List, Optional, Set, Tuple, Union
+
+# Optional io_uring backend for copying many small files (Linux only).
+try:
+    import liburing  # type: ignore
+except ImportError:
+    liburing = None
 
 # --- Configuration for Logging ---
 LOG_FILE = 'datasync_log.txt'
-logging.basicConfig(
-    filename=LOG_FILE,
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
-)
 
-def is_safe_path(path: Path) -> bool:
+# Configured on first use rather than at import, so importing core never
+# creates a log file in whatever directory the process happens to be in.
+_logger: Optional[logging.Logger] = None
+
+def _log() -> logging.Logger:
+    """
+    Returns the DataSink logger, setting it up on the first call.
+    Like logging.basicConfig(), the log file is only attached when the
+    application hasn't configured the root logger itself. If the log file
+    can't be opened (read-only or deleted working directory), messages are
+    dropped rather than failing the operation being logged.
+    """
+    global _logger
+    if _logger is None:
+        logger = logging.getLogger('datasync')
+        logger.setLevel(logging.INFO)
+        if not logging.getLogger().handlers:
+            handler: logging.Handler
+            try:
+                handler = logging.FileHandler(LOG_FILE)
+            except OSError:
+                handler = logging.NullHandler()
+            handler.setFormatter(logging.Formatter(
+                '%(asctime)s - %(levelname)s - %(message)s',
+                datefmt='%Y-%m-%d %H:%M:%S'
+            ))
+            logger.addHandler(handler)
+        _logger = logger
+    return _logger
+
+# Every resolve in this module goes through this name, so tests can intercept
+# it here instead of patching pathlib.Path.resolve for the whole process.
+_resolve: Callable[[Path], Path] = Path.resolve
+
+@functools.lru_cache(maxsize=None)
+def _resolved_root(path: str) -> Path:
+    """
+    Resolves one of the allowed root directories (home or working directory).
+    Results are keyed on the unresolved string, so a later chdir() is still
+    picked up while repeated checks skip the symlink walk.
+    """
+    return _resolve(Path(path))
+
+
+def _is_within(child: Path, parent: Path) -> bool:
+    """
+    Returns True if 'child' is 'parent' or lies somewhere beneath it.
+    Both paths must already be absolute; this is a plain string comparison,
+    so no parent Path objects are built and the filesystem is not touched.
+    """
+    child_str = os.path.normcase(os.fspath(child))
+    parent_str = os.path.normcase(os.fspath(parent))
+    if child_str == parent_str:
+        return True
+    if not parent_str.endswith(os.sep):
+        parent_str += os.sep
+    return child_str.startswith(parent_str)
+
+
+def is_safe_path(path: Path, resolved: Optional[Path] = None, cwd: Optional[Path] = None,
+                 *, lexical: bool = False) -> bool:
     """
     Checks if a path is safe to write to.
     A safe path is one that resolves within the current user's home directory 
     or a subdirectory of the current working directory.
     This helps prevent path traversal attacks.
+    Callers that have already resolved 'path' (or the working directory) can
+    pass them as 'resolved' and 'cwd'. With 'lexical=True', a relative path
+    with no '..' components is accepted without resolving its symlinks.
     """
     # this function needs to be revisted; the user experience needs
     # to be changed to something more flexible.
+
+    # Opt-in fast path: a plain relative path with no '..' components is
+    # lexically inside the working directory. It doesn't follow symlinks, so
+    # the default check always resolves the path below.
+    if lexical and resolved is None and not path.drive and not path.is_absolute() and '..' not in path.parts:
+        return True
+
     try:
         # Resolve the path to its absolute form, following any symlinks.
-        abs_path = path.resolve(strict=True)
-        # Get the user's home directory.
-        home_dir = Path.home().resolve(strict=True)
-        # Get the current working directory.
-        cwd = Path.cwd().resolve(strict=True)
-        
-        # A path is "safe" if it is within the user's home directory OR
-        # within the current working directory.
-        is_in_home = home_dir in abs_path.parents or abs_path == home_dir
-        is_in_cwd = cwd in abs_path.parents or abs_path == cwd
-        
-        return is_in_home or is_in_cwd
-    except (FileNotFoundError, RuntimeError):
-        # The path doesn't exist or is a broken symlink, but we can still check
-        # its intended absolute location.
+        abs_path = resolved if resolved is not None else _resolve(path)
+        # A path is "safe" if it is within the current working directory OR
+        # within the user's home directory. The working directory is the
+        # usual case for the CLI, so it is checked first and home is only
+        # looked up when that fails.
+        if cwd is None:
+            cwd = _resolved_root(os.getcwd())
+        if _is_within(abs_path, cwd):
+            return True
+        return _is_within(abs_path, _resolved_root(str(Path.home())))
+    except (OSError, RuntimeError):
+        # The path can't be resolved (e.g. a symlink loop), but we can still
+        # check its intended absolute location.
         abs_path = Path(os.path.abspath(path))
-        home_dir = Path.home()
-        cwd = Path.cwd()
-        is_in_home = home_dir in abs_path.parents or abs_path == home_dir
-        is_in_cwd = cwd in abs_path.parents or abs_path == cwd
-        return is_in_home or is_in_cwd
+        if _is_within(abs_path, Path.cwd()):
+            return True
+        return _is_within(abs_path, Path.home())
     except Exception as e:
-        logging.error(f"Path safety check failed for '{path}': {e}")
+        _log().error(f"Path safety check failed for '{path}': {e}")
         return False
 
 
-def sync_data(source_path: str, destination_path: str, operation: str = 'copy'):
+# --- File Copy Helpers ---
+
+# Chunk size for sendfile() and for the read/write fallback loop. shutil's own
+# default (64 KiB on Linux) is raised too, since shutil.move() still copies
+# with it when source and destination are on different filesystems.
+_COPY_BUFSIZE = 1024 * 1024
+shutil.COPY_BUFSIZE = _COPY_BUFSIZE  # type: ignore[attr-defined]
+
+# One read buffer per copying thread, allocated the first time it is needed.
+_thread_buffers = threading.local()
+
+_OPEN_READ_FLAGS = os.O_RDONLY | getattr(os, 'O_CLOEXEC', 0) | getattr(os, 'O_BINARY', 0)
+_OPEN_WRITE_FLAGS = os.O_WRONLY | os.O_CREAT | getattr(os, 'O_CLOEXEC', 0) | getattr(os, 'O_BINARY', 0)
+
+# Errors meaning "the kernel can't do this copy for us", not "the copy failed".
+_KERNEL_COPY_FALLBACK_ERRNOS = {
+    errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EBADF,
+    getattr(errno, 'EOPNOTSUPP', errno.EINVAL), getattr(errno, 'ENOTSUP', errno.EINVAL),
+}
+
+
+# copy_file_range()/sendfile() between regular files, and io_uring, are only
+# relied on where they are known to work.
+_KERNEL_COPY_PLATFORM = hasattr(os, 'sendfile') and sys.platform.startswith('linux')
+
+# The real os.open, captured at import. Filesystem fakes such as pyfakefs swap
+# the module's 'os' for an object whose descriptors are made up; those must
+# never be handed to the kernel (or io_uring), where they would name whatever
+# real file happens to have that number.
+_REAL_OS_OPEN = os.open
+
+
+def _kernel_copy_enabled() -> bool:
+    """
+    Returns True if the kernel may copy between two of our descriptors
+    (copy_file_range(), sendfile(), io_uring): we are on Linux and 'os' is
+    the real module, not a filesystem fake.
+    """
+    return _KERNEL_COPY_PLATFORM and os.open is _REAL_OS_OPEN
+
+
+def _copy_buffer() -> memoryview:
+    """Returns this thread's reusable read buffer."""
+    view = getattr(_thread_buffers, 'view', None)
+    if view is None:
+        view = _thread_buffers.view = memoryview(bytearray(_COPY_BUFSIZE))
+    return view
+
+
+def _copy_range_loop(copy_chunk: Callable[[int], int]) -> int:
+    """
+    Calls copy_chunk(offset) until it reports end of file and returns the
+    number of bytes copied. If the very first call fails with an error in
+    _KERNEL_COPY_FALLBACK_ERRNOS, 0 is returned so the caller can fall back.
+    """
+    offset = 0
+    try:
+        while True:
+            copied = copy_chunk(offset)
+            if copied == 0:
+                return offset
+            offset += copied
+    except OSError as e:
+        if offset == 0 and e.errno in _KERNEL_COPY_FALLBACK_ERRNOS:
+            return 0
+        raise
+
+
+def _copy_fd_contents(src_fd: int, dst_fd: int) -> None:
+    """
+    Copies everything from src_fd to dst_fd, preferring copy_file_range()
+    (which lets the filesystem reflink or copy server-side), then sendfile(),
+    and finally a plain read/write loop.
+    """
+    if _kernel_copy_enabled():
+        if hasattr(os, 'copy_file_range'):
+            if _copy_range_loop(lambda offset: os.copy_file_range(
+                    src_fd, dst_fd, _COPY_BUFSIZE, offset, offset)):
+                return
+        if _copy_range_loop(lambda offset: os.sendfile(dst_fd, src_fd, offset, _COPY_BUFSIZE)):
+            return
+
+    view = _copy_buffer()
+    with open(src_fd, 'rb', buffering=0, closefd=False) as fsrc, \
+            open(dst_fd, 'wb', buffering=0, closefd=False) as fdst:
+        while True:
+            n = fsrc.readinto(view)
+            if not n:
+                break
+            # An unbuffered write may take only part of the chunk.
+            written = 0
+            while written < n:
+                written += fdst.write(view[written:n])
+
+
+def _copy_metadata(dst: str, st: os.stat_result) -> None:
+    """Applies the permission bits and timestamps from 'st' to 'dst'."""
+    os.utime(dst, ns=(st.st_atime_ns, st.st_mtime_ns))
+    os.chmod(dst, stat.S_IMODE(st.st_mode))
+
+
+def _fast_copyfile(src: str, dst: str, src_stat: Optional[os.stat_result] = None) -> None:
+    """
+    Copies the file 'src' to the file path 'dst' along with its permission bits
+    and timestamps, like shutil.copy2(). If the caller already has the source's
+    stat result (e.g. from os.scandir) it can pass it in to skip an fstat().
+    """
+    src_fd = os.open(src, _OPEN_READ_FLAGS)
+    try:
+        st = src_stat if src_stat is not None else os.fstat(src_fd)
+        dst_fd = os.open(dst, _OPEN_WRITE_FLAGS, 0o666)
+        try:
+            # Only truncate once we know we are not about to empty the source.
+            # (os.truncate on the descriptor rather than os.ftruncate, which
+            # pyfakefs does not support for files opened with os.open.)
+            dst_st = os.fstat(dst_fd)
+            if (dst_st.st_dev, dst_st.st_ino) == (st.st_dev, st.st_ino):
+                raise shutil.SameFileError(f"'{src}' and '{dst}' are the same file")
+            os.truncate(dst_fd, 0)
+            _copy_fd_contents(src_fd, dst_fd)
+        finally:
+            os.close(dst_fd)
+    finally:
+        os.close(src_fd)
+
+    _copy_metadata(dst, st)
+
+
+# --- Optional io_uring Backend ---
+
+# Small files are copied through io_uring in batches: each file is one read
+# linked to one write, and the whole batch is submitted with a single syscall.
+_URING_MAX_FILE_SIZE = _COPY_BUFSIZE
+_URING_BATCH_SIZE = 32
+# Every file in a batch gets a buffer of its own size, so a batch is also
+# closed once its files add up to this many bytes, and only a few batches
+# are in flight at once: at most 4 x 4 MiB of buffers, whatever the pool size.
+_URING_BATCH_MAX_BYTES = 4 * _COPY_BUFSIZE
+_uring_batch_slots = threading.BoundedSemaphore(4)
+
+# Cleared the first time the kernel turns out not to support what we need.
+_uring_supported = True
+
+
+def _uring_enabled() -> bool:
+    """Returns True if batches of small files should go through io_uring."""
+    return liburing is not None and _uring_supported and _kernel_copy_enabled()
+
+
+def _copy_batch_uring(batch: 'List[Tuple[os.DirEntry[str], str]]') -> None:
+    """
+    Copies a batch of small files found by the tree walker through one io_uring
+    submission. Any file the ring doesn't copy cleanly (the kernel lacks the
+    opcodes, or the file changed size under us) is redone with _copy_one,
+    which also surfaces genuine I/O errors.
+    """
+    with _uring_batch_slots:
+        _copy_batch_uring_locked(batch)
+
+
+def _copy_batch_uring_locked(batch: 'List[Tuple[os.DirEntry[str], str]]') -> None:
+    """The body of _copy_batch_uring, run while holding a batch slot."""
+    global _uring_supported
+    ring = liburing.Ring()
+    try:
+        liburing.io_uring_queue_init(2 * len(batch), ring)
+    except Exception:
+        # No io_uring here (old kernel, seccomp, ...): don't try again.
+        _uring_supported = False
+        for entry, dst_path in batch:
+            _copy_one(entry, dst_path)
+        return
+
+    fds: List[int] = []
+    pending: List[int] = []
+    failed: Set[int] = set()
+    try:
+        # Keep the buffers alive until the ring has finished with them.
+        buffers: List[bytearray] = []
+        for i, (entry, dst_path) in enumerate(batch):
+            st = entry.stat()
+            src_fd = os.open(entry.path, _OPEN_READ_FLAGS)
+            fds.append(src_fd)
+            dst_fd = os.open(dst_path, _OPEN_WRITE_FLAGS, 0o666)
+            fds.append(dst_fd)
+            dst_st = os.fstat(dst_fd)
+            if (dst_st.st_dev, dst_st.st_ino) == (st.st_dev, st.st_ino):
+                raise shutil.SameFileError(f"'{entry.path}' and '{dst_path}' are the same file")
+            os.truncate(dst_fd, 0)
+            if st.st_size == 0:
+                continue
+            buf = bytearray(st.st_size)
+            buffers.append(buf)
+            sqe = liburing.io_uring_get_sqe(ring)
+            liburing.io_uring_prep_read(sqe, src_fd, buf, 0)
+            liburing.io_uring_sqe_set_flags(sqe, liburing.IOSQE_IO_LINK)
+            liburing.io_uring_sqe_set_data64(sqe, i)
+            sqe = liburing.io_uring_get_sqe(ring)
+            liburing.io_uring_prep_write(sqe, dst_fd, buf, 0)
+            liburing.io_uring_sqe_set_data64(sqe, i)
+            pending.append(st.st_size)
+            pending.append(st.st_size)
+
+        if pending:
+            liburing.io_uring_submit_and_wait(ring, len(pending))
+            cqe = liburing.Cqe()
+            for _ in pending:
+                liburing.io_uring_wait_cqe(ring, cqe)
+                completion = cqe[0]
+                index = completion.user_data
+                res = completion.res
+                liburing.io_uring_cqe_seen(ring, completion)
+                if res is None or res < 0 or res != batch[index][0].stat().st_size:
+                    failed.add(index)
+                    if res is not None and -res in (errno.EINVAL, getattr(errno, 'EOPNOTSUPP', errno.EINVAL)):
+                        _uring_supported = False
+    finally:
+        for fd in fds:
+            os.close(fd)
+        liburing.io_uring_queue_exit(ring)
+
+    for i, (entry, dst_path) in enumerate(batch):
+        if i in failed:
+            _copy_one(entry, dst_path)
+        else:
+            _copy_metadata(dst_path, entry.stat())
+
+
+# --- Directory Copy Helpers ---
+
+def _copy_one(entry: 'os.DirEntry[str]', dst_path: str) -> None:
+    """
+    Copies a single file found by the tree walker. The stat result cached on
+    the DirEntry is reused for the metadata so the source is never stat'ed twice.
+    """
+    _fast_copyfile(entry.path, dst_path, entry.stat())
+
+
+class _UringBatch:
+    """Small files the tree walker is collecting for one _copy_batch_uring call."""
+
+    def __init__(self) -> None:
+        self.files: 'List[Tuple[os.DirEntry[str], str]]' = []
+        self.size = 0
+
+    def flush(self, executor: ThreadPoolExecutor, futures: 'List[Future[None]]') -> None:
+        """Queues the collected files, if any, and starts a new batch."""
+        if self.files:
+            futures.append(executor.submit(_copy_batch_uring, self.files))
+            self.files = []
+            self.size = 0
+
+
+def _walk_tree(src: str, dst: str, src_stat: os.stat_result, executor: ThreadPoolExecutor,
+               futures: 'List[Future[None]]', dirs: List[Tuple[str, os.stat_result]],
+               batch: _UringBatch, errors: List[Tuple[str, str, str]]) -> None:
+    """
+    Recreates the directory structure of 'src' under 'dst' using a single
+    os.scandir() pass per directory and queues every file on the executor.
+    Each entry's type comes from the directory listing and its stat() result
+    is the only one ever taken for it, for directories and files alike.
+    When io_uring is available, small files are collected in 'batch' and
+    queued a batch at a time instead, a batch holding at most
+    _URING_BATCH_SIZE files and _URING_BATCH_MAX_BYTES bytes. Entries that
+    aren't regular files (named pipes, sockets, devices) are never opened;
+    like shutil.copytree, they are recorded in 'errors' along with any
+    subdirectory that can't be read, and the rest of the tree is still copied.
+    """
+    os.makedirs(dst, exist_ok=True)
+    dirs.append((dst, src_stat))
+    use_uring = _uring_enabled()
+    with os.scandir(src) as it:
+        for entry in it:
+            dst_path = os.path.join(dst, entry.name)
+            if entry.is_dir():
+                # A subdirectory that can't be created or listed is reported
+                # with the rest, as shutil.copytree does, not the whole walk.
+                try:
+                    _walk_tree(entry.path, dst_path, entry.stat(), executor, futures, dirs, batch, errors)
+                except OSError as e:
+                    errors.append((entry.path, dst_path, str(e)))
+                continue
+            try:
+                st = entry.stat()
+            except OSError as e:
+                errors.append((entry.path, dst_path, str(e)))
+                continue
+            if not stat.S_ISREG(st.st_mode):
+                kind = 'a named pipe' if stat.S_ISFIFO(st.st_mode) else 'not a regular file'
+                errors.append((entry.path, dst_path, f"`{entry.path}` is {kind}"))
+            elif use_uring and st.st_size <= _URING_MAX_FILE_SIZE:
+                if batch.size + st.st_size > _URING_BATCH_MAX_BYTES:
+                    batch.flush(executor, futures)
+                batch.files.append((entry, dst_path))
+                batch.size += st.st_size
+                if len(batch.files) == _URING_BATCH_SIZE:
+                    batch.flush(executor, futures)
+            else:
+                futures.append(executor.submit(_copy_one, entry, dst_path))
+
+
+def _copy_tree_parallel(src: Union[str, Path], dst: Union[str, Path],
+                        workers: int = min(32, (os.cpu_count() or 1) * 4)) -> None:
+    """
+    Copies the directory 'src' to 'dst', merging into 'dst' if it already exists.
+    The tree is walked on the calling thread while the file copies are spread
+    over a thread pool, which keeps many-small-files trees from being copied
+    one file at a time. Entries that can't be copied are reported together
+    in a shutil.Error once everything else is done, as shutil.copytree does.
+    """
+    futures: 'List[Future[None]]' = []
+    dirs: List[Tuple[str, os.stat_result]] = []
+    errors: List[Tuple[str, str, str]] = []
+    src = os.fspath(src)
+    batch = _UringBatch()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        _walk_tree(src, os.fspath(dst), os.stat(src), executor, futures, dirs, batch, errors)
+        batch.flush(executor, futures)
+    # Re-raise the first failure, if any, now that all the workers are done.
+    for future in futures:
+        future.result()
+    # Directory timestamps change while files are written into them,
+    # so they are applied last, deepest directories first.
+    for dst_dir, st in reversed(dirs):
+        _copy_metadata(dst_dir, st)
+    if errors:
+        raise shutil.Error(errors)
+
+
+def _move_tree(src: Path, dst: Path) -> None:
+    """
+    Moves the directory 'src' to 'dst', replacing any existing 'dst'.
+    Within one filesystem this is normally a single rename(); the old 'dst'
+    is only deleted first when rename() can't replace it (it isn't empty),
+    and shutil.move() only has to copy when crossing filesystems. Any other
+    rename() failure is raised without touching 'dst'.
+    """
+    try:
+        os.replace(src, dst)
+    except OSError as e:
+        if e.errno not in (errno.ENOTEMPTY, errno.EEXIST, errno.EXDEV):
+            raise
+        try:
+            shutil.rmtree(dst)
+        except FileNotFoundError:
+            pass
+        shutil.move(src, dst)
+
+
+# --- Operation Handlers ---
+# Each handler carries out one (source is a directory, operation) pair and
+# returns the success message; errors are raised and reported by sync_data.
+
+def _copy_dir(source: Path, destination: Path, src_stat: os.stat_result) -> str:
+    dest_dir = destination / source.name
+    _copy_tree_parallel(source, dest_dir)
+    return f"Successfully copied directory '{source}' to '{dest_dir}'."
+
+
+def _move_dir(source: Path, destination: Path, src_stat: os.stat_result) -> str:
+    # 'x/..' or '.' has no name of its own, and 'destination / source.name'
+    # would then be the destination or one of its parents, which _move_tree
+    # may delete.
+    if source.name in ('', '.', '..'):
+        raise ValueError(f"Cannot move '{source}': name the directory itself instead")
+    _move_tree(source, destination / source.name)
+    return f"Successfully moved directory '{source}' to '{destination}'."
+
+
+def _copy_file(source: Path, destination: Path, src_stat: os.stat_result) -> str:
+    _fast_copyfile(str(source), str(destination / source.name), src_stat)
+    return f"Successfully copied file '{source}' to '{destination}'."
+
+
+def _move_file(source: Path, destination: Path, src_stat: os.stat_result) -> str:
+    target = destination / source.name
+    # Same rule as shutil.move(source, destination): never replace an
+    # existing file (or nest inside a directory) of the same name. With that
+    # ruled out, 'target' is never a directory, so the Paths can go straight
+    # to shutil.move.
+    if os.path.lexists(target):
+        raise shutil.Error(f"Destination path '{target}' already exists")
+    shutil.move(source, target)
+    return f"Successfully moved file '{source}' to '{destination}'."
+
+
+_OPS = {
+    (True, 'copy'): _copy_dir,
+    (True, 'move'): _move_dir,
+    (False, 'copy'): _copy_file,
+    (False, 'move'): _move_file,
+}
+
+
+def sync_data(source_path: str, destination_path: str, operation: str = 'copy') -> Tuple[bool, str]:
     """
     Synchronizes data from a source to a destination.
     """
@@ -61,79 +528,77 @@ def sync_data(source_path: str, destination_path: str, operation: str = 'copy'):
     
     # --- SECURITY: Path Validation ---
     try:
-        if not source.exists():
+        # A single stat answers both "does the source exist?" here and
+        # "is it a file or a directory?" further down.
+        # Path.exists() treated a symlink loop as missing too, so ELOOP is
+        # reported the same way.
+        try:
+            src_stat = os.stat(source)
+        except (OSError, ValueError) as e:
+            if isinstance(e, OSError) and e.errno not in (errno.ENOENT, errno.ENOTDIR, errno.ELOOP):
+                raise
             message = f"Error: Source path '{source}' does not exist."
-            logging.error(message)
+            _log().error(message)
             return False, message
 
-        if not is_safe_path(destination):
+        # Resolve both paths once; the safety check and the self-copy
+        # check below share the results.
+        src_res: Optional[Path]
+        dst_res: Optional[Path]
+        try:
+            src_res = _resolve(source)
+            dst_res = _resolve(destination)
+        except (OSError, RuntimeError, ValueError):
+            src_res = dst_res = None
+
+        if not is_safe_path(destination, dst_res):
             message = f"Error: Destination path '{destination}' is outside of the allowed directories (your home directory or current working directory)."
-            logging.error(message)
+            _log().error(message)
             return False, message
     except (OSError, ValueError) as e:
         message = f"Error processing path: Invalid path provided. Reason {e}"
-        logging.error(message)
+        _log().error(message)
         return False, message
         
     # SECURITY: Prevent copying a directory into itself
-    try:
-        if source.resolve() in destination.resolve().parents or source.resolve() == destination.resolve():
+    # (skipped if either path could not be resolved above)
+    if src_res is not None and dst_res is not None:
+        if _is_within(dst_res, src_res):
             message = "Error: Cannot copy or move a directory into itself or a subdirectory."
-            logging.error(message)
+            _log().error(message)
             return False, message
-    except (FileNotFoundError, ValueError):
-        # This can happen if the destination doesn't exist yet, which is fine.
-        # or if a path is invalid (ValueError), which are both fine to ignore here.
-        pass
 
     # Ensure the destination directory exists before file operations
     if not destination.is_dir():
         try:
             destination.mkdir(parents=True, exist_ok=True)
-            logging.info(f"Created destination directory: '{destination}'")
+            _log().info(f"Created destination directory: '{destination}'")
         except (OSError, ValueError) as e:
             message = f"Error: Could not create destination directory '{destination}'. Reason: {e}"
-            logging.error(message)
+            _log().error(message)
             return False, message
 
+    is_dir = stat.S_ISDIR(src_stat.st_mode)
+    if not is_dir and not stat.S_ISREG(src_stat.st_mode):
+        message = f"Error: Source path '{source}' is not a file or directory."
+        _log().error(message)
+        return False, message
+
+    handler = _OPS.get((is_dir, operation))
+    if handler is None:
+        kind = 'directory' if is_dir else 'file'
+        message = f"Invalid operation '{operation}' specified for {kind}."
+        _log().error(message)
+        return False, message
+
     try:
-        if source.is_dir():
-            dest_dir = destination / source.name
-            if operation == 'copy':
-                shutil.copytree(source, dest_dir, dirs_exist_ok=True)
-                message = f"Successfully copied directory '{source}' to '{dest_dir}'."
-            elif operation == 'move':
-                if dest_dir.exists():
-                    shutil.rmtree(dest_dir)
-                shutil.move(str(source), str(destination))
-                message = f"Successfully moved directory '{source}' to '{destination}'."
-            else:
-                message = f"Invalid operation '{operation}' specified for directory."
-                logging.error(message)
-                return False, message
-                
-        elif source.is_file():
-            if operation == 'copy':
-                shutil.copy2(source, destination)
-                message = f"Successfully copied file '{source}' to '{destination}'."
-            elif operation == 'move':
-                shutil.move(str(source), str(destination))
-                message = f"Successfully moved file '{source}' to '{destination}'."
-            else:
-                message = f"Invalid operation '{operation}' specified for file."
-                logging.error(message)
-                return False, message
-        else:
-            message = f"Error: Source path '{source}' is not a file or directory."
-            logging.error(message)
-            return False, message
-            
-        logging.info(message)
+        message = handler(source, destination, src_stat)
+        _log().info(message)
         return True, message
 
     except (shutil.Error, OSError, ValueError) as e:
         message = f"An error occurred during the '{operation}' operation: {e}"
-        logging.error(message)
+        _log().error(message)
         return False, message
 
 if __name__ == '__main__': # pragma: no cover
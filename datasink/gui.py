@@ -3,12 +3,30 @@
 
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-import threading
+from concurrent.futures import ProcessPoolExecutor
 import os
 
 # We will import our trusted datasink.core logic
 from datasink.core import sync_data
 
+# File operations run in a separate worker process so the tree walk is never
+# competing with the Tk main loop for the GIL. It is started on first use.
+_executor = None
+
+def _get_executor():
+    """Return the shared worker-process pool, creating it if needed."""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=1)
+    return _executor
+
+def _shutdown_executor():
+    """Stop the (idle) worker process so the application can exit."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown()
+        _executor = None
+
 class DataSinkGUI:
     """
     The main application class for the DataSink GUI.
@@ -19,6 +37,9 @@ class DataSinkGUI:
         self.root.title("DataSink | Simple File Transfer")
         self.root.geometry("600x450")
         self.root.minsize(500, 400)
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
+        # The future of the operation in progress, if any
+        self._operation = None
         
         # --- Style Configuration ---
         self.style = ttk.Style(self.root)
@@ -96,7 +117,7 @@ class DataSinkGUI:
         self.status_text.see(tk.END)
 
     def _start_operation_thread(self):
-        """Validate inputs and start the sync_data operation in a new thread."""
+        """Validate inputs and start the sync_data operation in the worker process."""
         source = self.source_var.get()
         destination = self.dest_var.get()
         operation = self.operation_var.get()
@@ -111,19 +132,23 @@ class DataSinkGUI:
         
         self.run_button.config(state='disabled')
 
-        # Run the file operation in a separate thread to prevent the GUI from freezing
-        thread = threading.Thread(
-            target=self._run_sync_data, 
-            args=(source, destination, operation)
-        )
-        thread.daemon = True # Allows main window to close even if thread is running
-        thread.start()
-
-    def _run_sync_data(self, source, dest, op):
-        """Worker function that calls the datasink.core logic."""
-        success, message = sync_data(source, dest, op)
+        # Run the file operation in the worker process to prevent the GUI from freezing
+        self._operation = _get_executor().submit(sync_data, source, destination, operation)
+        self._operation.add_done_callback(self._on_operation_done)
+
+    def _on_operation_done(self, future):
+        """Callback for the worker's result; hands it back to the Tk main loop."""
+        try:
+            success, message = future.result()
+        except Exception as e:
+            # e.g. the worker process was killed before it could answer
+            success, message = False, f"The operation could not be completed: {e}"
         # Schedule the UI update to run on the main thread
-        self.root.after(0, self.update_ui_after_operation, success, message)
+        try:
+            self.root.after(0, self.update_ui_after_operation, success, message)
+        except (tk.TclError, RuntimeError):
+            # The window was destroyed before the worker answered
+            pass
 
     def update_ui_after_operation(self, success, message):
         """Update the UI after the operation is finished."""
@@ -135,6 +160,20 @@ class DataSinkGUI:
             messagebox.showerror("Error", message)
         
         self.run_button.config(state='normal')
+        self._operation = None
+
+    def _on_close(self):
+        """Close the main window, unless an operation is still running."""
+        # A copy or move can't be stopped halfway without leaving a partial
+        # result, and the worker keeps the process alive until it is done.
+        if self._operation is not None and not self._operation.done():
+            messagebox.showwarning(
+                "Operation in progress",
+                "Please wait for the current operation to finish before closing DataSink."
+            )
+            return
+        _shutdown_executor()
+        self.root.destroy()
 
 def launch_app():
     """Create and run the Tkinter application."""
@@ -1,14 +1,26 @@
 import atheris
 import sys
 import os
-import tempfile
-from pathlib import Path
 
-# We need to add the parent directory to the path to import from 'datasink'
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from pyfakefs.fake_filesystem_unittest import Patcher
 
+# 'datasink' is importable without touching sys.path: Python already puts this
+# script's directory (the project root) first on the path.
 from datasink.core import sync_data
 
+SEED_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC
+
+def write_seed_file(path):
+    """
+    Writes the small seed payload with raw os calls, skipping the
+    TextIOWrapper/BufferedWriter objects that open() would build.
+    """
+    fd = os.open(path, SEED_FLAGS, 0o600)
+    try:
+        os.write(fd, b"fuzz")
+    finally:
+        os.close(fd)
+
 def TestOneInput(data):
     """
     The entry point for the fuzzer. Atheris calls this with random bytes.
@@ -30,12 +42,16 @@ def TestOneInput(data):
     try:
         # Create a source file or directory to ensure there's something to copy/move
         if len(source_name) % 2 == 0 and source_name: # Make a dir sometimes
-            os.makedirs(source_name, exist_ok=True)
-            with open(Path(source_name) / "test.txt", "w") as f:
-                f.write("fuzz")
+            try:
+                os.mkdir(source_name)
+            except FileExistsError:
+                pass
+            except FileNotFoundError:
+                # Only nested names need the parent directories created too.
+                os.makedirs(source_name, exist_ok=True)
+            write_seed_file(os.path.join(source_name, "test.txt"))
         elif source_name: # Make a file other times
-             with open(source_name, "w") as f:
-                f.write("fuzz")
+            write_seed_file(source_name)
     except (OSError, UnicodeEncodeError, ValueError):
         # The generated path might be invalid for the OS (e.g., contains null bytes).
         # This is a valid state to test, so we just pass.
@@ -48,7 +64,7 @@ def TestOneInput(data):
 
 def main():
     """
-    Sets up the fuzzer in a temporary directory to sandbox file operations.
+    Sets up the fuzzer on an in-memory fake filesystem to sandbox file operations.
     """
     # --- NEW: Build an absolute path to the corpus directory ---
     # Get the directory where the script is located
@@ -63,20 +79,16 @@ def main():
             # Replace the relative path argument with the absolute one
             sys.argv[1] = corpus_path
 
-    # Keep track of the original directory
-    original_cwd = os.getcwd()
-
-    # Create a temporary directory that will be automatically cleaned up
-    with tempfile.TemporaryDirectory() as temp_dir:
-        os.chdir(temp_dir) # Move into the sandbox
+    # Setup reads the command line (and libFuzzer reads the corpus) natively,
+    # so it runs before the real filesystem is swapped out.
+    atheris.Setup(sys.argv, TestOneInput)
 
-        try:
-            # Setup and run the fuzzer
-            atheris.Setup(sys.argv, TestOneInput)
-            atheris.Fuzz()
-        finally:
-            # IMPORTANT: Change back to the original directory after fuzzing
-            os.chdir(original_cwd)
+    # pyfakefs patches os, open, shutil and pathlib with an in-memory filesystem,
+    # so every iteration runs at memory speed and the real disk is never touched.
+    with Patcher() as patcher:
+        patcher.fs.create_dir('/home/fuzz')
+        os.chdir('/home/fuzz')
+        atheris.Fuzz()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,25 @@
+# setup.py
+# Project metadata lives in pyproject.toml; this file only exists to add the
+# optional mypyc build of datasink.core.
+#
+# Set DATASINK_USE_MYPYC=1 when building to compile core.py to a C extension.
+# mypyc isn't in the isolated build environment pip creates from pyproject.toml,
+# so install it first and build without isolation:
+#     pip install mypy setuptools wheel
+#     DATASINK_USE_MYPYC=1 pip install --no-build-isolation .
+
+import os
+from setuptools import setup
+
+ext_modules = []
+if os.environ.get("DATASINK_USE_MYPYC") == "1":
+    try:
+        from mypyc.build import mypycify
+    except ImportError:
+        raise SystemExit(
+            "DATASINK_USE_MYPYC=1 needs mypy in the build environment: "
+            "pip install mypy, then build with 'pip install --no-build-isolation .'"
+        )
+    ext_modules = mypycify(["datasink/core.py"])
+
+setup(ext_modules=ext_modules)
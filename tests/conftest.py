@@ -0,0 +1,20 @@
+# tests/conftest.py
+# Shared pytest setup for the DataSink test suite.
+
+import pytest
+
+# Every test module needs the package, so import it once here at collection
+# start; the test modules' own imports are then plain sys.modules lookups.
+import datasink.cli
+import datasink.core
+
+@pytest.fixture(autouse=True)
+def clear_allowed_roots():
+    """
+    Empties is_safe_path's memoized root directories around every test.
+    Tests chdir, patch Path.home and swap in pyfakefs, so a root resolved
+    in one test must not be reused by the next.
+    """
+    datasink.core._resolved_root.cache_clear()
+    yield
+    datasink.core._resolved_root.cache_clear()
@@ -2,192 +2,482 @@
 # Pytest file for testing the datasink.core logic in datasink.core.py
 
 import os
+import errno
+import io
+import stat
 import shutil
+import logging
+from collections import namedtuple
 import pytest
 from pathlib import Path
-from unittest.mock import patch, MagicMock
+from unittest.mock import MagicMock
 
-# We import the functions to be tested
-from datasink.core import sync_data, is_safe_path
+# The module under test; functions are looked up on it at call time, so
+# monkeypatched attributes are always the ones used.
+from datasink import core as _core
 
 # --- Test Fixtures and Setup ---
 
-TEST_SOURCE_DIR = "test_source"
-TEST_DEST_DIR = "test_dest"
-TEST_SOURCE_FILE = os.path.join(TEST_SOURCE_DIR, "test_file.txt")
+SAMPLE_TEXT = "This is a test file."
 
-def setup_function():
-    """Create fresh test directories and a sample file for each test."""
-    if os.path.exists(TEST_SOURCE_DIR):
-        shutil.rmtree(TEST_SOURCE_DIR)
-    if os.path.exists(TEST_DEST_DIR):
-        shutil.rmtree(TEST_DEST_DIR)
+# Resolved once at import, before run_in_tmp_path moves each test into its own
+# directory; tests that use _CWD as the working directory pass it as 'cwd'.
+_CWD = Path.cwd().resolve()
+_HOME = Path.home().resolve()
 
-    os.makedirs(os.path.join(TEST_SOURCE_DIR, "subfolder"), exist_ok=True)
-    os.makedirs(TEST_DEST_DIR, exist_ok=True)
-    with open(TEST_SOURCE_FILE, "w") as f:
-        f.write("This is a test file.")
+@pytest.fixture(autouse=True)
+def run_in_tmp_path(tmp_path, monkeypatch):
+    """Run each test from its own temporary directory so destinations pass is_safe_path."""
+    monkeypatch.chdir(tmp_path)
 
-def teardown_function():
-    """Remove test directories and files after each test."""
-    if os.path.exists(TEST_SOURCE_DIR):
-        shutil.rmtree(TEST_SOURCE_DIR)
-    if os.path.exists(TEST_DEST_DIR):
-        shutil.rmtree(TEST_DEST_DIR)
+@pytest.fixture(scope="session")
+def template_tree(tmp_path_factory):
+    """
+    Builds the sample source tree once per session; tests get hardlinked
+    copies of it through 'dirs'.
+    """
+    template = tmp_path_factory.mktemp("template", numbered=False)
+    (template / "subfolder").mkdir()
+    (template / "test_file.txt").write_text(SAMPLE_TEXT)
+    return template
 
-# --- NEW TEST TO COVER LINES 67-69 ---
+Dirs = namedtuple("Dirs", "source_dir dest_dir source_file")
 
-def test_unsafe_destination_is_rejected():
+@pytest.fixture
+def dirs(tmp_path, template_tree):
     """
-    Tests that an unsafe destination path is correctly blocked by the
-    is_safe_path check, covering the corresponding error message block.
+    Returns Dirs(source_dir, dest_dir, source_file) under tmp_path. Directories
+    are recreated and files hardlinked from the session template, so no file
+    data is written per test. Moves only rename or unlink the links, and
+    copies never write to the source, so the template stays intact.
     """
-    # Using a path like /etc/ is a classic example of an unsafe destination
-    success, message = sync_data(TEST_SOURCE_FILE, "/etc/unsafe_destination", 'copy')
-    assert success is False
-    assert "is outside of the allowed directories" in message
+    source_dir = tmp_path / "src"
+    for dirpath, dirnames, filenames in os.walk(template_tree):
+        target = source_dir / os.path.relpath(dirpath, template_tree)
+        target.mkdir()
+        for name in filenames:
+            os.link(Path(dirpath, name), target / name)
+    dest_dir = tmp_path / "dst"
+    dest_dir.mkdir()
+    return Dirs(source_dir, dest_dir, source_dir / "test_file.txt")
 
-# --- Existing Comprehensive Test Suite ---
+@pytest.fixture
+def fake_cwd(fs):
+    """
+    Runs a test on pyfakefs's in-memory filesystem from /work. Used by tests
+    that only exercise sync_data's checks and never need real file data.
+    """
+    fs.create_dir("/work")
+    os.chdir("/work")
+    return Path("/work")
 
-def test_copy_directory_success():
-    """Tests the straightforward successful copy of an entire directory."""
-    success, message = sync_data(TEST_SOURCE_DIR, TEST_DEST_DIR, 'copy')
-    assert success is True
-    assert "Successfully copied" in message
-    copied_dir_path = os.path.join(TEST_DEST_DIR, TEST_SOURCE_DIR)
-    assert os.path.isdir(copied_dir_path)
-    assert os.path.exists(os.path.join(copied_dir_path, "test_file.txt"))
+def _assert_file(path):
+    """Asserts that 'path' is a regular file, with a single stat()."""
+    assert stat.S_ISREG(os.stat(path).st_mode)
 
-def test_self_copy_check_with_nonexistent_dest():
+def _assert_dir_with_file(directory, name):
     """
-    Tests the self-copy check's 'except FileNotFoundError' block.
+    Asserts that 'directory' exists and holds a regular file 'name', reading
+    the type from one scandir() of the directory rather than a stat() each.
     """
-    non_existent_dest = os.path.join(TEST_SOURCE_DIR, "non_existent_subfolder")
-    success, message = sync_data(TEST_SOURCE_DIR, non_existent_dest, 'copy')
+    with os.scandir(directory) as it:
+        entries = {entry.name: entry for entry in it}
+    assert name in entries and entries[name].is_file(follow_symlinks=False)
+
+# --- Existing Comprehensive Test Suite ---
+
+@pytest.mark.parametrize("src_is_dir, op, expected_kw", [
+    pytest.param(False, 'copy', 'copied', id="copy-file"),
+    pytest.param(False, 'move', 'moved', id="move-file"),
+    pytest.param(True, 'copy', 'copied', id="copy-dir"),
+    pytest.param(True, 'move', 'moved', id="move-dir"),
+])
+def test_sync_success(dirs, src_is_dir, op, expected_kw):
+    """Tests a successful copy or move of a single file or a whole directory."""
+    src = dirs.source_dir if src_is_dir else dirs.source_file
+    success, message = _core.sync_data(src, dirs.dest_dir, op)
+    assert success is True
+    assert f"Successfully {expected_kw}" in message
+    copied_parent = dirs.dest_dir / dirs.source_dir.name if src_is_dir else dirs.dest_dir
+    _assert_dir_with_file(copied_parent, "test_file.txt")
+    assert src.exists() is (op == 'copy')
+
+@pytest.mark.parametrize("source, destination, op, expected_substr", [
+    pytest.param("src", "src/non_existent_subfolder", 'copy',
+                 "Cannot copy or move a directory into itself", id="self-copy-new-dest"),
+    pytest.param("src", "src/subfolder", 'copy',
+                 "Cannot copy or move a directory into itself", id="self-copy-existing-dest"),
+    pytest.param("src/test_file.txt", "dst", 'delete', "Invalid operation 'delete'", id="invalid-op-file"),
+    pytest.param("src", "dst", 'delete', "Invalid operation 'delete'", id="invalid-op-dir"),
+    # /etc/ is a classic example of an unsafe destination
+    pytest.param("src/test_file.txt", "/etc/unsafe_destination", 'copy',
+                 "is outside of the allowed directories", id="unsafe-dest"),
+])
+def test_sync_failure(fs, fake_cwd, source, destination, op, expected_substr):
+    """Tests the requests sync_data rejects before copying or moving anything."""
+    fs.create_file(fake_cwd / "src" / "test_file.txt", contents=SAMPLE_TEXT)
+    fs.create_dir(fake_cwd / "src" / "subfolder")
+    success, message = _core.sync_data(fake_cwd / source, fake_cwd / destination, op)
     assert success is False
-    assert "Cannot copy or move a directory into itself" in message
+    assert expected_substr in message
+
+def test_copy_directory_preserves_nested_files_and_metadata(dirs):
+    """Tests that a nested tree is copied with its contents and timestamps."""
+    nested_file = dirs.source_dir / "subfolder" / "nested.txt"
+    nested_file.write_text("nested")
+    os.utime(nested_file, (1_000_000_000, 1_000_000_000))
+    os.utime(dirs.source_dir / "subfolder", (1_100_000_000, 1_100_000_000))
+    success, message = _core.sync_data(dirs.source_dir, dirs.dest_dir, 'copy')
+    assert success is True
+    copied_file = dirs.dest_dir / dirs.source_dir.name / "subfolder" / "nested.txt"
+    assert copied_file.read_text() == "nested"
+    assert os.stat(copied_file).st_mtime == 1_000_000_000
+    copied_subfolder = dirs.dest_dir / dirs.source_dir.name / "subfolder"
+    assert os.stat(copied_subfolder).st_mtime == 1_100_000_000
+
+@pytest.mark.skipif(_core.liburing is None, reason="requires liburing")
+def test_copy_directory_through_io_uring_batches(dirs):
+    """Tests that small files copied through io_uring batches arrive intact."""
+    for i in range(40):
+        (dirs.source_dir / f"small_{i}.txt").write_text("x" * i)
+    success, message = _core.sync_data(dirs.source_dir, dirs.dest_dir, 'copy')
+    assert success is True
+    for i in range(40):
+        assert (dirs.dest_dir / dirs.source_dir.name / f"small_{i}.txt").read_text() == "x" * i
 
-def test_copy_file_success():
-    """Tests the successful copy of a single file."""
-    success, message = sync_data(TEST_SOURCE_FILE, TEST_DEST_DIR, 'copy')
+def test_io_uring_unavailable_falls_back(monkeypatch, dirs):
+    """Tests that a ring that can't be created disables io_uring and still copies."""
+    mock_liburing = MagicMock()
+    mock_liburing.io_uring_queue_init.side_effect = OSError(errno.ENOSYS, "Function not implemented")
+    monkeypatch.setattr(_core, 'liburing', mock_liburing)
+    monkeypatch.setattr(_core, '_uring_enabled', lambda: True)
+    monkeypatch.setattr(_core, '_uring_supported', True)
+    success, message = _core.sync_data(dirs.source_dir, dirs.dest_dir, 'copy')
     assert success is True
-    assert os.path.exists(os.path.join(TEST_DEST_DIR, "test_file.txt"))
+    _assert_file(dirs.dest_dir / dirs.source_dir.name / "test_file.txt")
+    assert _core._uring_supported is False
 
-def test_move_file_success():
-    """Tests the successful move of a single file."""
-    success, message = sync_data(TEST_SOURCE_FILE, TEST_DEST_DIR, 'move')
+def test_io_uring_batches_are_capped_by_size(monkeypatch, dirs):
+    """Tests that a batch is closed once its files reach _URING_BATCH_MAX_BYTES."""
+    batches = []
+    def record_batch(batch):
+        batches.append(sum(entry.stat().st_size for entry, _ in batch))
+        for entry, dst_path in batch:
+            _core._copy_one(entry, dst_path)
+    monkeypatch.setattr(_core, '_uring_enabled', lambda: True)
+    monkeypatch.setattr(_core, '_copy_batch_uring', record_batch)
+    monkeypatch.setattr(_core, '_URING_BATCH_MAX_BYTES', 100)
+    for i in range(10):
+        (dirs.source_dir / f"small_{i}.txt").write_text("x" * 40)
+    success, message = _core.sync_data(dirs.source_dir, dirs.dest_dir, 'copy')
     assert success is True
-    assert os.path.exists(os.path.join(TEST_DEST_DIR, "test_file.txt"))
-    assert not os.path.exists(TEST_SOURCE_FILE)
+    assert len(batches) > 1 and max(batches) <= 100
+    assert (dirs.dest_dir / dirs.source_dir.name / "small_9.txt").read_text() == "x" * 40
 
-def test_destination_is_created_if_not_exists():
+def test_destination_is_created_if_not_exists(tmp_path, dirs):
     """Tests that the destination directory is created if it does not exist."""
-    shutil.rmtree(TEST_DEST_DIR)
-    success, message = sync_data(TEST_SOURCE_FILE, TEST_DEST_DIR, 'copy')
+    new_dest = tmp_path / "new_dst"
+    success, message = _core.sync_data(dirs.source_file, new_dest, 'copy')
     assert success is True
-    assert os.path.isdir(TEST_DEST_DIR)
-    assert os.path.exists(os.path.join(TEST_DEST_DIR, "test_file.txt"))
+    _assert_dir_with_file(new_dest, "test_file.txt")
 
-def test_source_path_does_not_exist():
+def test_source_path_does_not_exist(fake_cwd):
     """Tests that a non-existent source path returns an error."""
-    success, message = sync_data("non_existent_file.txt", TEST_DEST_DIR, 'copy')
+    non_existent_source = str(fake_cwd / "nope.txt")
+    success, message = _core.sync_data(non_existent_source, fake_cwd / "dst", 'copy')
     assert success is False
-    assert "does not exist" in message
+    assert message.startswith("Error: Source path '")
+    assert message.endswith("' does not exist.")
+    assert non_existent_source in message
 
-def test_self_copy_check_with_existing_dest():
-    """Tests self-copy check when destination exists and is a subdir of source."""
-    dest_subdir = os.path.join(TEST_SOURCE_DIR, "subfolder")
-    success, message = sync_data(TEST_SOURCE_DIR, dest_subdir, 'copy')
+def test_source_symlink_loop_is_rejected(tmp_path):
+    """Tests that a source that is a symlink loop is reported as not existing."""
+    loop = tmp_path / "loop"
+    loop.symlink_to(loop)
+    success, message = _core.sync_data(loop, tmp_path / "dst", 'copy')
     assert success is False
-    assert "Cannot copy or move a directory into itself" in message
+    assert message.endswith("' does not exist.")
 
-@patch('datasink.core.is_safe_path', return_value=True) # Isolate the test
-@patch('pathlib.Path.resolve')
-def test_self_copy_check_handles_filenotfound(mock_resolve, mock_is_safe):
+def test_self_copy_check_handles_filenotfound(monkeypatch, dirs):
     """
-    Covers the 'except FileNotFoundError' block in the self-copy check
-    by simulating a resolve failure on the destination path.
+    Covers the case where the destination can't be resolved, which skips
+    the self-copy check, by simulating a resolve failure on the destination path.
     """
+    monkeypatch.setattr(_core, 'is_safe_path', lambda *args: True) # Isolate the test
     # The code will call resolve() on source, then destination. We make the second one fail.
-    mock_resolve.side_effect = [
-        Path(TEST_SOURCE_DIR).resolve(), 
-        FileNotFoundError
-    ]
-    
+    monkeypatch.setattr(_core, '_resolve', MagicMock(side_effect=[dirs.source_dir, FileNotFoundError]))
+
     # Since the exception is caught and passed, the operation should succeed.
-    success, message = sync_data(TEST_SOURCE_DIR, TEST_DEST_DIR, 'copy')
-    
+    success, message = _core.sync_data(dirs.source_dir, dirs.dest_dir, 'copy')
+
     assert success is True
     assert "Successfully copied" in message
 
-def test_move_directory_to_existing_destination_overwrites():
+@pytest.mark.parametrize("existing", ["file", "dir"])
+def test_move_file_does_not_replace_existing_destination(dirs, existing):
+    """Tests that moving a file refuses to overwrite (or nest into) an existing entry."""
+    target = dirs.dest_dir / "test_file.txt"
+    if existing == "file":
+        target.write_text("keep me")
+    else:
+        target.mkdir()
+    success, message = _core.sync_data(dirs.source_file, dirs.dest_dir, 'move')
+    assert success is False
+    assert f"Destination path '{target}' already exists" in message
+    _assert_file(dirs.source_file)
+    if existing == "file":
+        assert target.read_text() == "keep me"
+    else:
+        assert list(target.iterdir()) == []
+
+def test_move_directory_to_existing_destination_overwrites(dirs):
     """Tests moving a directory to an existing location, ensuring overwrite."""
-    dest_with_source_name = os.path.join(TEST_DEST_DIR, TEST_SOURCE_DIR)
-    os.makedirs(dest_with_source_name, exist_ok=True)
-    with open(os.path.join(dest_with_source_name, "old_file.txt"), "w") as f:
-        f.write("This should be deleted.")
-    success, message = sync_data(TEST_SOURCE_DIR, TEST_DEST_DIR, 'move')
+    dest_with_source_name = dirs.dest_dir / dirs.source_dir.name
+    dest_with_source_name.mkdir()
+    (dest_with_source_name / "old_file.txt").write_text("This should be deleted.")
+    success, message = _core.sync_data(dirs.source_dir, dirs.dest_dir, 'move')
     assert success is True
     assert "Successfully moved" in message
-    assert os.path.exists(os.path.join(TEST_DEST_DIR, TEST_SOURCE_DIR, "test_file.txt"))
-    assert not os.path.exists(os.path.join(TEST_DEST_DIR, TEST_SOURCE_DIR, "old_file.txt"))
-    assert not os.path.exists(TEST_SOURCE_DIR)
+    with os.scandir(dest_with_source_name) as it:
+        names = {entry.name for entry in it}
+    assert names == {"test_file.txt", "subfolder"}
+    assert not dirs.source_dir.exists()
+
+def test_move_directory_hands_off_to_move_tree(monkeypatch, fs, fake_cwd):
+    """Tests that a directory move asks _move_tree to replace <dest>/<source name>."""
+    mock_move_tree = MagicMock()
+    monkeypatch.setattr(_core, '_move_tree', mock_move_tree)
+    fs.create_file(fake_cwd / "src" / "test_file.txt", contents=SAMPLE_TEXT)
+    success, message = _core.sync_data(fake_cwd / "src", fake_cwd / "dst", 'move')
+    assert success is True
+    assert "Successfully moved" in message
+    mock_move_tree.assert_called_once_with(fake_cwd / "src", fake_cwd / "dst" / "src")
+
+def test_move_directory_to_new_destination_is_a_rename(dirs):
+    """Tests that a same-filesystem directory move keeps the same inode."""
+    source_inode = os.stat(dirs.source_dir).st_ino
+    success, message = _core.sync_data(dirs.source_dir, dirs.dest_dir, 'move')
+    assert success is True
+    assert os.stat(dirs.dest_dir / dirs.source_dir.name).st_ino == source_inode
+    assert not dirs.source_dir.exists()
+
+def test_move_directory_across_filesystems(monkeypatch, dirs):
+    """Tests the shutil.move fallback used when rename() can't cross filesystems."""
+    monkeypatch.setattr(_core.os, 'replace', MagicMock(side_effect=OSError(errno.EXDEV, "Invalid cross-device link")))
+    success, message = _core.sync_data(dirs.source_dir, dirs.dest_dir, 'move')
+    assert success is True
+    _assert_file(dirs.dest_dir / dirs.source_dir.name / "test_file.txt")
+    assert not dirs.source_dir.exists()
 
-@patch('shutil.copy2', side_effect=OSError("Disk full"))
-def test_generic_os_error_on_file_copy(mock_copy2):
+def test_move_directory_keeps_destination_when_rename_fails(monkeypatch, dirs):
+    """Tests that a rename error other than 'not empty' or EXDEV never deletes the destination."""
+    existing = dirs.dest_dir / dirs.source_dir.name
+    existing.mkdir()
+    (existing / "keep.txt").write_text("keep me")
+    monkeypatch.setattr(_core.os, 'replace', MagicMock(side_effect=OSError(errno.EBUSY, "Device or resource busy")))
+    success, message = _core.sync_data(dirs.source_dir, dirs.dest_dir, 'move')
+    assert success is False
+    assert "Device or resource busy" in message
+    assert (existing / "keep.txt").read_text() == "keep me"
+    _assert_file(dirs.source_file)
+
+def test_move_directory_without_a_name_is_refused(tmp_path):
+    """Tests that a source like 'x/y/..' is refused instead of replacing a parent of the destination."""
+    (tmp_path / "x" / "y").mkdir(parents=True)
+    (tmp_path / "d").mkdir()
+    (tmp_path / "unrelated.txt").write_text("keep me")
+    success, message = _core.sync_data("x/y/..", "d/..", 'move')
+    assert success is False
+    assert "Cannot move 'x/y/..'" in message
+    assert (tmp_path / "unrelated.txt").read_text() == "keep me"
+    assert (tmp_path / "x" / "y").is_dir()
+
+def test_shutil_error_handling(monkeypatch, dirs):
+    """Tests the generic shutil.Error exception handling."""
+    monkeypatch.setattr(_core, '_copy_tree_parallel', MagicMock(side_effect=shutil.Error("Mock shutil error")))
+    success, message = _core.sync_data(dirs.source_dir, dirs.dest_dir, 'copy')
+    assert success is False
+    assert "An error occurred" in message
+
+def test_generic_os_error_on_file_copy(monkeypatch, dirs):
     """Tests the final 'except' block by simulating an OSError during a file copy."""
-    success, message = sync_data(TEST_SOURCE_FILE, TEST_DEST_DIR, 'copy')
+    monkeypatch.setattr(_core, '_fast_copyfile', MagicMock(side_effect=OSError("Disk full")))
+    success, message = _core.sync_data(dirs.source_file, dirs.dest_dir, 'copy')
     assert success is False
     assert "An error occurred during the 'copy' operation: Disk full" in message
-    
-def test_invalid_operation_for_file():
-    """Tests providing an invalid operation for a file."""
-    success, message = sync_data(TEST_SOURCE_FILE, TEST_DEST_DIR, 'delete')
-    assert success is False
-    assert "Invalid operation 'delete'" in message
 
-def test_invalid_operation_for_directory():
-    """Tests providing an invalid operation for a directory."""
-    success, message = sync_data(TEST_SOURCE_DIR, TEST_DEST_DIR, 'delete')
+def test_copy_file_onto_itself_keeps_contents(dirs):
+    """Tests that copying a file into its own directory fails without truncating it."""
+    success, message = _core.sync_data(dirs.source_file, dirs.source_dir, 'copy')
     assert success is False
-    assert "Invalid operation 'delete'" in message
+    assert "are the same file" in message
+    assert dirs.source_file.read_text() == SAMPLE_TEXT
+
+def test_copy_file_without_kernel_copy(monkeypatch, dirs):
+    """Tests the read/write fallback used when the kernel copy paths are unavailable."""
+    monkeypatch.setattr(_core, '_kernel_copy_enabled', lambda: False)
+    success, message = _core.sync_data(dirs.source_file, dirs.dest_dir, 'copy')
+    assert success is True
+    assert (dirs.dest_dir / "test_file.txt").read_text() == SAMPLE_TEXT
+
+def test_copy_file_without_kernel_copy_handles_short_writes(monkeypatch, dirs):
+    """Tests that the read/write fallback keeps writing when a write is only partial."""
+    class ShortWriteFileIO(io.FileIO):
+        def write(self, data):
+            return super().write(data[:3])
+
+    def open_short_writes(fd, mode, buffering=-1, closefd=True):
+        cls = ShortWriteFileIO if 'w' in mode else io.FileIO
+        return cls(fd, mode, closefd=closefd)
+
+    monkeypatch.setattr(_core, '_kernel_copy_enabled', lambda: False)
+    monkeypatch.setattr(_core, 'open', open_short_writes, raising=False)
+    success, message = _core.sync_data(dirs.source_file, dirs.dest_dir, 'copy')
+    assert success is True
+    assert (dirs.dest_dir / "test_file.txt").read_text() == SAMPLE_TEXT
+
+@pytest.mark.parametrize("source, copied", [
+    pytest.param("src/test_file.txt", "dst/test_file.txt", id="file"),
+    pytest.param("src", "dst/src/test_file.txt", id="dir"),
+])
+def test_copy_on_fake_filesystem_keeps_contents(fs, fake_cwd, source, copied):
+    """Tests that under pyfakefs the copy never hands fake descriptors to the kernel."""
+    fs.create_file(fake_cwd / "src" / "test_file.txt", contents=SAMPLE_TEXT)
+    assert _core._kernel_copy_enabled() is False
+    success, message = _core.sync_data(fake_cwd / source, fake_cwd / "dst", 'copy')
+    assert success is True
+    assert (fake_cwd / copied).read_text() == SAMPLE_TEXT
 
-@patch('pathlib.Path.mkdir', side_effect=OSError("Permission denied"))
-def test_destination_creation_os_error(mock_mkdir):
+def test_destination_creation_os_error(fs, fake_cwd):
     """Tests handling of OSError during destination directory creation."""
-    shutil.rmtree(TEST_DEST_DIR)
-    success, message = sync_data(TEST_SOURCE_FILE, TEST_DEST_DIR, 'copy')
+    fs.create_file(fake_cwd / "test_file.txt", contents=SAMPLE_TEXT)
+    # A regular file where the destination directory should go makes mkdir fail.
+    fs.create_file(fake_cwd / "dst")
+    success, message = _core.sync_data(fake_cwd / "test_file.txt", fake_cwd / "dst", 'copy')
     assert success is False
     assert "Could not create destination directory" in message
 
-@patch('datasink.core.Path.mkdir')
-@patch('datasink.core.Path.is_dir', return_value=False)
-@patch('datasink.core.Path.is_file', return_value=False)
-def test_source_is_not_file_or_dir(mock_is_file, mock_is_dir, mock_mkdir):
-    """Tests the final 'else' block for an invalid source type."""
-    success, message = sync_data(TEST_SOURCE_DIR, TEST_DEST_DIR, 'copy')
+@pytest.mark.skipif(not hasattr(os, 'mkfifo'), reason="requires os.mkfifo")
+def test_source_is_not_file_or_dir(tmp_path):
+    """Tests the final 'else' block for an invalid source type (a named pipe)."""
+    fifo_path = tmp_path / "pipe"
+    os.mkfifo(fifo_path)
+    success, message = _core.sync_data(fifo_path, tmp_path / "dst", 'copy')
     assert success is False
     assert "is not a file or directory" in message
 
+@pytest.mark.skipif(not hasattr(os, 'mkfifo'), reason="requires os.mkfifo")
+def test_copy_directory_with_named_pipe_reports_it(dirs):
+    """Tests that a FIFO inside the tree is reported, not opened, and the rest is copied."""
+    os.mkfifo(dirs.source_dir / "subfolder" / "pipe")
+    success, message = _core.sync_data(dirs.source_dir, dirs.dest_dir, 'copy')
+    assert success is False
+    assert "is a named pipe" in message
+    _assert_file(dirs.dest_dir / dirs.source_dir.name / "test_file.txt")
+    assert not (dirs.dest_dir / dirs.source_dir.name / "subfolder" / "pipe").exists()
+
+def test_copy_directory_with_unreadable_subfolder_reports_it(monkeypatch, dirs):
+    """Tests that a subfolder that can't be listed is reported and the rest is copied."""
+    real_scandir = os.scandir
+    def scandir(path):
+        if os.path.basename(path) == "subfolder":
+            raise PermissionError(errno.EACCES, "Permission denied", path)
+        return real_scandir(path)
+    monkeypatch.setattr(_core.os, 'scandir', scandir)
+    success, message = _core.sync_data(dirs.source_dir, dirs.dest_dir, 'copy')
+    assert success is False
+    assert "Permission denied" in message
+    _assert_file(dirs.dest_dir / dirs.source_dir.name / "test_file.txt")
+
 # --- is_safe_path Specific Tests ---
 
 def test_is_safe_path_for_safe_paths():
     """Tests that is_safe_path correctly identifies safe paths."""
-    assert is_safe_path(Path.cwd() / "safe_subdir") is True
-    assert is_safe_path(Path.home() / "safe_subdir") is True
+    assert _core.is_safe_path(_CWD / "safe_subdir", cwd=_CWD) is True
+    assert _core.is_safe_path(_HOME / "safe_subdir") is True
 
 def test_is_safe_path_for_unsafe_paths():
     """Tests that is_safe_path correctly identifies unsafe paths."""
-    assert is_safe_path(Path("/etc/")) is False
+    assert _core.is_safe_path(Path("/etc/")) is False
+
+def test_is_within_compares_whole_path_components():
+    """Tests that a sibling sharing a name prefix is not treated as a child."""
+    parent = _CWD / "data"
+    assert _core._is_within(parent, parent) is True
+    assert _core._is_within(parent / "sub" / "file.txt", parent) is True
+    assert _core._is_within(_CWD / "data2", parent) is False
+    assert _core._is_within(_CWD, parent) is False
+
+def test_is_safe_path_accepts_plain_relative_paths(monkeypatch):
+    """Tests the opt-in lexical fast path for relative paths that stay under the CWD."""
+    monkeypatch.setattr(_core, '_resolve', MagicMock(side_effect=AssertionError("resolved")))
+    assert _core.is_safe_path(Path("dest_dir"), lexical=True) is True
+    assert _core.is_safe_path(Path("dest_dir") / "nested", lexical=True) is True
 
-@patch('pathlib.Path.resolve')
-def test_is_safe_path_handles_runtime_error(mock_resolve):
-    """Tests the except block for broken symbolic links."""
-    mock_resolve.side_effect = RuntimeError("Broken symlink")
-    assert is_safe_path(Path.cwd() / "some_path") is True
+def test_is_safe_path_relative_with_parent_reference_is_checked(monkeypatch):
+    """Tests that a '..' component skips the fast path and is fully checked."""
+    monkeypatch.setattr(_core, '_resolved_root', lambda path: Path("/nonexistent_root"))
+    assert _core.is_safe_path(Path("..") / "outside", lexical=True) is False
 
-@patch('datasink.core.Path.home', side_effect=Exception("Unexpected mock error"))
-def test_is_safe_path_handles_unexpected_error(mock_home):
+def test_is_safe_path_follows_relative_symlinks():
+    """Tests that by default a relative path is resolved, so a symlink out of the CWD is caught."""
+    os.symlink("/etc", "etc_link")
+    assert _core.is_safe_path(Path("etc_link") / "passwd") is False
+
+def test_is_safe_path_uses_pre_resolved_path():
+    """Tests that a caller-supplied resolved path is checked instead of resolving again."""
+    assert _core.is_safe_path(Path("anything"), Path("/etc")) is False
+    assert _core.is_safe_path(Path("/etc"), _CWD / "safe_subdir", cwd=_CWD) is True
+    assert _core.is_safe_path(Path("/etc/x"), Path("/etc/x"), cwd=Path("/etc")) is True
+
+def test_is_safe_path_handles_symlink_loop(tmp_path):
+    """Tests the except block for symbolic links that can't be resolved."""
+    loop = tmp_path / "loop"
+    loop.symlink_to(loop)
+    assert _core.is_safe_path(loop / "some_path") is True
+
+def test_is_safe_path_handles_unexpected_error(monkeypatch):
     """Tests the generic 'except Exception' block in is_safe_path."""
-    assert is_safe_path(Path(TEST_DEST_DIR)) is False
+    monkeypatch.setattr(_core.Path, 'home', MagicMock(side_effect=Exception("Unexpected mock error")))
+    assert _core.is_safe_path(Path("/etc/unsafe_destination")) is False
+
+def test_is_safe_path_checks_cwd_before_home(monkeypatch):
+    """Tests that a path under the working directory never needs the home directory."""
+    mock_home = MagicMock()
+    monkeypatch.setattr(_core.Path, 'home', mock_home)
+    assert _core.is_safe_path(Path.cwd() / "dst") is True
+    mock_home.assert_not_called()
+
+
+# --- Logging Tests ---
+
+def test_log_file_is_attached_on_first_use(tmp_path, monkeypatch):
+    """Tests that the log file is only opened when something is first logged."""
+    log_file = tmp_path / "datasync_log.txt"
+    monkeypatch.setattr(_core, '_logger', None)
+    monkeypatch.setattr(_core, 'LOG_FILE', str(log_file))
+    monkeypatch.setattr(logging.getLogger(), 'handlers', [])
+    assert not log_file.exists()
+    logger = _core._log()
+    try:
+        logger.info("hello from the test")
+        assert "INFO - hello from the test" in log_file.read_text()
+    finally:
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+            handler.close()
 
+def test_unwritable_log_file_does_not_fail_the_operation(tmp_path, monkeypatch, dirs):
+    """Tests that a log file that can't be opened doesn't stop sync_data."""
+    monkeypatch.setattr(_core, '_logger', None)
+    monkeypatch.setattr(_core, 'LOG_FILE', str(tmp_path / "missing_dir" / "datasync_log.txt"))
+    monkeypatch.setattr(logging.getLogger(), 'handlers', [])
+    logger = _core._log()
+    try:
+        success, message = _core.sync_data(dirs.source_file, dirs.dest_dir, 'copy')
+        assert success is True
+        assert _core._log() is logger
+    finally:
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+            handler.close()
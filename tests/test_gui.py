@@ -6,6 +6,8 @@ import tkinter as tk
 from unittest.mock import patch, MagicMock
 
 # We need to import the class we are testing
+from datasink.core import sync_data
+import datasink.gui
 from datasink.gui import DataSinkGUI
 
 # --- Test Fixture ---
@@ -24,10 +26,10 @@ def app():
 
 # --- GUI Behavior Tests ---
 
-@patch('datasink.gui.threading.Thread')
-def test_start_operation_thread_starts_thread(mock_thread, app):
+@patch('datasink.gui._get_executor')
+def test_start_operation_thread_submits_to_worker(mock_get_executor, app):
     """
-    Tests that clicking the 'Run' button correctly starts a background thread.
+    Tests that clicking the 'Run' button submits the operation to the worker process.
     """
     # Arrange
     app.source_var.set("/fake/source")
@@ -37,11 +39,24 @@ def test_start_operation_thread_starts_thread(mock_thread, app):
     app._start_operation_thread()
     
     # Assert
-    mock_thread.assert_called_once()
-    # Check that the thread was started with the correct target and arguments
-    call_args = mock_thread.call_args.kwargs
-    assert call_args['target'] == app._run_sync_data
-    assert call_args['args'] == ("/fake/source", "/fake/destination", "copy")
+    executor = mock_get_executor.return_value
+    executor.submit.assert_called_once_with(sync_data, "/fake/source", "/fake/destination", "copy")
+    future = executor.submit.return_value
+    future.add_done_callback.assert_called_once_with(app._on_operation_done)
+    assert str(app.run_button.cget('state')) == 'disabled'
+
+def test_worker_failure_is_reported(app):
+    """
+    Tests that an exception from the worker process is turned into an error message.
+    """
+    future = MagicMock()
+    future.result.side_effect = RuntimeError("worker died")
+    with patch.object(app.root, 'after') as mock_after:
+        app._on_operation_done(future)
+    mock_after.assert_called_once_with(
+        0, app.update_ui_after_operation, False,
+        "The operation could not be completed: worker died"
+    )
 
 @patch('tkinter.messagebox.showinfo')
 def test_update_ui_after_success(mock_showinfo, app):
@@ -95,3 +110,35 @@ def test_browse_buttons(mock_askdirectory, app):
     # Assert
     assert app.dest_var.get() == "/mock/path/folder"
 
+def test_close_shuts_down_idle_worker(app):
+    """
+    Tests that closing the window with no operation running stops the worker pool.
+    """
+    executor = MagicMock()
+    with patch('datasink.gui._executor', executor), patch.object(app.root, 'destroy') as mock_destroy:
+        app._on_close()
+        assert datasink.gui._executor is None
+    executor.shutdown.assert_called_once_with()
+    mock_destroy.assert_called_once_with()
+
+@patch('tkinter.messagebox.showwarning')
+def test_close_during_operation_keeps_window_open(mock_showwarning, app):
+    """
+    Tests that closing the window while an operation runs warns instead of closing.
+    """
+    app._operation = MagicMock()
+    app._operation.done.return_value = False
+    with patch('datasink.gui._shutdown_executor') as mock_shutdown, patch.object(app.root, 'destroy') as mock_destroy:
+        app._on_close()
+    mock_showwarning.assert_called_once()
+    mock_shutdown.assert_not_called()
+    mock_destroy.assert_not_called()
+
+def test_worker_result_after_window_closed_is_ignored(app):
+    """
+    Tests that a result arriving after the window is destroyed doesn't raise.
+    """
+    future = MagicMock()
+    future.result.return_value = (True, "done")
+    with patch.object(app.root, 'after', side_effect=tk.TclError("application has been destroyed")):
+        app._on_operation_done(future)